@@ -1,17 +1,36 @@
 import datetime as dt
+import hashlib
+import io
+import json
 import logging
 import re
-from typing import Dict, List
+import threading
+import time
+from typing import Dict, List, Optional
 
-import feedparser
+from lxml import etree
+
+from paper_radar.gh_cache import CACHE_DIR, FileCache, is_fresh
+from paper_radar.http_utils import build_session
 
 logger = logging.getLogger(__name__)
 
 
 ARXIV_API = "http://export.arxiv.org/api/query"
+# arXiv 按天更新，一小时内的重复查询直接复用结果；过期后走 ETag/Last-Modified 条件请求
+ARXIV_CACHE_TTL = 3600
+_FEED_CACHE = FileCache(CACHE_DIR / "arxiv")
+_SESSION = build_session()
+# arXiv 要求串行访问 API，多个会议并发处理时共享这一把锁
+ARXIV_SEM = threading.BoundedSemaphore(1)
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+GITHUB_PATTERN = re.compile(r"https?://github\.com/[A-Za-z0-9_.\-]+/[A-Za-z0-9_.\-]+")
 
 
-def build_query(conf_name: str, year: int, categories: List[str], keywords: List[str]) -> str:
+def build_query(
+    conf_name: str, year: int, categories: List[str], keywords: List[str], start_date: Optional[str] = None
+) -> str:
     base_terms = [f"abs:\"{conf_name} {year}\"", f"title:\"{conf_name} {year}\""]
     category_filter = " OR ".join([f"cat:{c}" for c in categories])
     keyword_filter = " OR ".join([f"abs:\"{kw}\"" for kw in keywords]) if keywords else ""
@@ -20,71 +39,111 @@ def build_query(conf_name: str, year: int, categories: List[str], keywords: List
         parts.append(f"({category_filter})")
     if keyword_filter:
         parts.append(f"({keyword_filter})")
+    if start_date:
+        # 让 arXiv 服务端按提交日期裁剪，start_date 为 YYYYMMDD
+        parts.append(f"submittedDate:[{start_date}0000 TO 999912312359]")
     return " AND ".join(parts)
 
 
-def search_arxiv(conf_name: str, year: int, categories: List[str], keywords: List[str], max_results: int, days: int) -> List[Dict]:
-    query = build_query(conf_name, year, categories, keywords)
-    start_date = (dt.datetime.utcnow() - dt.timedelta(days=days)).strftime("%Y%m%d")
-    url = (
-        f"{ARXIV_API}?search_query=({query})"
-        f"&sortBy=submittedDate&sortOrder=descending&max_results={max_results}"
-    )
-    logger.info("调用 arXiv API: %s", url)
-    feed = feedparser.parse(url)
+def _parse_feed(content: bytes, start_date: str, keywords: List[str]) -> List[Dict]:
     papers: List[Dict] = []
-    for entry in feed.entries:
-        submitted = entry.get("published")
-        if submitted and submitted[:10].replace("-", "") < start_date:
+    # 流式解析 Atom，每个 <entry> 结束即抽取字段并释放节点
+    for _, entry in etree.iterparse(io.BytesIO(content), events=("end",), tag=f"{ATOM_NS}entry"):
+        submitted = entry.findtext(f"{ATOM_NS}published")
+        if submitted and submitted[:4] + submitted[5:7] + submitted[8:10] < start_date:
+            entry.clear()
             continue
-        affiliations = []
-        for author in entry.get("authors", []):
-            aff = None
-            if isinstance(author, dict):
-                aff = author.get("affiliation") or author.get("affil")
-            else:
-                aff = getattr(author, "affiliation", None)
-            if aff:
-                if isinstance(aff, list):
-                    affiliations.extend([a for a in aff if a])
-                else:
-                    affiliations.append(aff)
-        supplemental = None
-        for link in entry.get("links", []):
-            rel = getattr(link, "rel", None) or link.get("rel") if isinstance(link, dict) else None
-            title = getattr(link, "title", None) or link.get("title") if isinstance(link, dict) else None
-            if rel == "related" or (title and "supp" in title.lower()):
-                supplemental = getattr(link, "href", None) or link.get("href")
-                break
-            if title and title.lower() == "doi":
-                supplemental = getattr(link, "href", None) or link.get("href")
-        pdf_url = next(
-            (
-                getattr(l, "href", None) or l.get("href")
-                for l in entry.get("links", [])
-                if getattr(l, "rel", None) == "alternate"
-                or getattr(l, "type", None) == "application/pdf"
-                or (isinstance(l, dict) and (l.get("rel") == "alternate" or l.get("type") == "application/pdf"))
-            ),
-            None,
-        )
+        authors = []
+        # dict 同时充当有序去重集合，无需再额外遍历一次
+        affiliations: Dict[str, None] = {}
+        for author in entry.iterfind(f"{ATOM_NS}author"):
+            authors.append((author.findtext(f"{ATOM_NS}name") or "").strip())
+            for aff in author.iterfind(f"{ARXIV_NS}affiliation"):
+                name = (aff.text or "").strip()
+                if name:
+                    affiliations[name] = None
+        pdf_url = supplemental = doi_url = None
+        for link in entry.iterfind(f"{ATOM_NS}link"):
+            rel, ltype, title, href = link.get("rel"), link.get("type"), link.get("title"), link.get("href")
+            tlow = title.lower() if title else ""
+            if pdf_url is None and (rel == "alternate" or ltype == "application/pdf"):
+                pdf_url = href
+            if supplemental is None and (rel == "related" or "supp" in tlow):
+                supplemental = href
+            if doi_url is None and tlow == "doi":
+                doi_url = href
         paper = {
-            "title": entry.get("title", "").replace("\n", " "),
-            "authors": ", ".join(a.get("name") for a in entry.get("authors", [])),
-            "abstract": entry.get("summary", ""),
+            "title": (entry.findtext(f"{ATOM_NS}title") or "").strip().replace("\n", " "),
+            "authors": ", ".join(authors),
+            "abstract": (entry.findtext(f"{ATOM_NS}summary") or "").strip(),
             "pdf_url": pdf_url,
-            "arxiv_id": entry.get("id", "").split("/abs/")[-1],
+            "arxiv_id": (entry.findtext(f"{ATOM_NS}id") or "").split("/abs/")[-1],
             "keywords": ", ".join(keywords),
-            "affiliations": "; ".join(dict.fromkeys(affiliations)),
-            "supplemental_url": supplemental,
+            "affiliations": "; ".join(affiliations),
+            "supplemental_url": supplemental or doi_url,
             "source": "arxiv",
         }
         papers.append(paper)
+        entry.clear()
+    return papers
+
+
+def search_arxiv(conf_name: str, year: int, categories: List[str], keywords: List[str], max_results: int, days: int) -> List[Dict]:
+    start_date = (dt.datetime.utcnow() - dt.timedelta(days=days)).strftime("%Y%m%d")
+    query = build_query(conf_name, year, categories, keywords, start_date)
+    params = {
+        "search_query": f"({query})",
+        "sortBy": "submittedDate",
+        "sortOrder": "descending",
+        "start": 0,
+        "max_results": max_results,
+    }
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    cached = _FEED_CACHE.get(key)
+    if cached is not None and is_fresh(cached):
+        logger.info("arXiv 缓存命中: %s", query)
+        return cached["data"]
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("modified"):
+            headers["If-Modified-Since"] = cached["modified"]
+    logger.info("调用 arXiv API: %s", query)
+    try:
+        with ARXIV_SEM:
+            resp = _SESSION.get(ARXIV_API, params=params, headers=headers, timeout=30)
+    except Exception as exc:
+        logger.warning("arXiv 请求失败 %s: %s", conf_name, exc)
+        return cached["data"] if cached else []
+    if cached is not None and resp.status_code == 304:
+        cached["timestamp"] = time.time()
+        _FEED_CACHE.set(key, cached)
+        return cached["data"]
+    if resp.status_code != 200:
+        logger.warning("arXiv API 返回 %s: %s", resp.status_code, conf_name)
+        # 限流或服务端错误时与请求异常一样，退回过期的缓存结果
+        return cached["data"] if cached else []
+    try:
+        papers = _parse_feed(resp.content, start_date, keywords)
+    except etree.XMLSyntaxError as exc:
+        # 截断或非 XML 的响应不写入缓存，与请求失败一样退回过期的缓存结果
+        logger.warning("arXiv 响应解析失败 %s: %s", conf_name, exc)
+        return cached["data"] if cached else []
+    _FEED_CACHE.set(
+        key,
+        {
+            "data": papers,
+            "etag": resp.headers.get("ETag"),
+            "modified": resp.headers.get("Last-Modified"),
+            "timestamp": time.time(),
+            "ttl": ARXIV_CACHE_TTL,
+        },
+    )
     return papers
 
 
 def extract_github_links(text: str) -> List[str]:
     if not text:
         return []
-    pattern = r"https?://github\.com/[\w\-\.]+/[\w\-\.]+"
-    return list({m.group(0) for m in re.finditer(pattern, text)})
+    return list({m.group(0) for m in GITHUB_PATTERN.finditer(text)})
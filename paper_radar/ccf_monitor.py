@@ -1,15 +1,24 @@
 import subprocess
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译 libyaml 时退回纯 Python 实现
+    from yaml import SafeLoader
+
 from paper_radar.db import mark_conference_triggered, upsert_conference
 
 
 CCF_DATA_FILE = "_data/conferences.yml"
 
+# (文件路径, mtime) -> 解析结果，文件未变化时不再重复解析 YAML
+_DEADLINES_CACHE: Dict[Tuple[str, float], Dict[str, str]] = {}
+
 
 def sync_ccf_repo(repo_dir: str):
     path = Path(repo_dir)
@@ -24,8 +33,11 @@ def load_deadlines(repo_dir: str) -> Dict[str, str]:
     data_path = Path(repo_dir) / CCF_DATA_FILE
     if not data_path.exists():
         return {}
+    cache_key = (str(data_path), data_path.stat().st_mtime)
+    if cache_key in _DEADLINES_CACHE:
+        return _DEADLINES_CACHE[cache_key]
     with open(data_path, "r", encoding="utf-8") as f:
-        confs = yaml.safe_load(f)
+        confs = yaml.load(f, Loader=SafeLoader)
     # map acronym -> deadline
     result: Dict[str, str] = {}
     for conf in confs:
@@ -33,9 +45,17 @@ def load_deadlines(repo_dir: str) -> Dict[str, str]:
         deadline = conf.get("deadline")
         if acronym and deadline:
             result[acronym] = deadline
+    for stale in [k for k in _DEADLINES_CACHE if k[0] == cache_key[0]]:
+        del _DEADLINES_CACHE[stale]
+    _DEADLINES_CACHE[cache_key] = result
     return result
 
 
+@lru_cache(maxsize=4096)
+def _parse_deadline(deadline_str: str) -> date:
+    return datetime.fromisoformat(deadline_str.replace("Z", "+00:00")).date()
+
+
 def select_triggered_conferences(db_path: str, config_confs: List, deadlines: Dict[str, str], lag_days: int) -> List:
     triggered = []
     now = datetime.utcnow()
@@ -46,7 +66,7 @@ def select_triggered_conferences(db_path: str, config_confs: List, deadlines: Di
         if not deadline_str:
             continue
         try:
-            deadline_date = datetime.fromisoformat(deadline_str.replace("Z", "+00:00")).date()
+            deadline_date = _parse_deadline(deadline_str)
         except Exception:
             continue
         if now.date() >= deadline_date + timedelta(days=lag_days):
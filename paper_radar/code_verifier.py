@@ -1,13 +1,36 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
-
-from paper_radar.llm_mcp import LLMClient, ToolSpec
+from paper_radar import db
+from paper_radar.gh_cache import GitHubCache, cache_key, is_fresh
+from paper_radar.http_utils import build_session, parse_json
+from paper_radar.llm_mcp import LLMClient
 
 logger = logging.getLogger(__name__)
 GITHUB_API = "https://api.github.com"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+# 元数据/README 变化慢，提交记录按小时刷新
+META_TTL = 24 * 3600
+README_TTL = 24 * 3600
+TREE_TTL = 24 * 3600
+COMMITS_TTL = 3600
+# 同时核验的仓库数上限，避免触发 GitHub secondary rate limit
+MAX_CONCURRENT_REPOS = 10
+# 全进程 GitHub 在途请求上限，多个会议并发核验时共享
+GH_SEM = threading.BoundedSemaphore(2 * MAX_CONCURRENT_REPOS)
+# 仓库核验结果在数据库中复用的天数，跨论文、跨会议、跨运行共享
+REPO_CACHE_DAYS = 7
+# 判定占位只需 README 开头
+README_PROMPT_CHARS = 2000
+
+CODE_EXTENSIONS = (".py", ".ipynb", ".cc", ".cpp", ".cu", ".js", ".java")
+
+_CACHE = GitHubCache()
+_SESSION = build_session()
 
 
 def _get_headers(token: Optional[str]):
@@ -17,117 +40,267 @@ def _get_headers(token: Optional[str]):
     return headers
 
 
-def fetch_repo_metadata(url: str, token: Optional[str]):
+def _split_repo(url: str) -> Tuple[str, str]:
     parts = url.rstrip("/").split("github.com/")[-1].split("/")
-    owner, repo = parts[0], parts[1]
-    resp = requests.get(f"{GITHUB_API}/repos/{owner}/{repo}", headers=_get_headers(token), timeout=10)
+    return parts[0], parts[1]
+
+
+def normalize_repo_url(url: str) -> str:
+    """GitHub 仓库名大小写不敏感，统一为 https://github.com/owner/repo 作为去重键。"""
+
+    try:
+        owner, repo = _split_repo(url)
+    except IndexError:
+        return url.rstrip("/")
+    if repo.endswith(".git"):
+        repo = repo[:-4]
+    return f"https://github.com/{owner}/{repo}".lower()
+
+
+def _cached_get(
+    owner: str,
+    repo: str,
+    endpoint: str,
+    token: Optional[str],
+    ttl: float,
+    params: Optional[Dict] = None,
+    refresh: bool = False,
+    raw: bool = False,
+) -> Tuple[int, Any]:
+    """带 TTL + ETag 的 GitHub GET，返回 (status_code, json)；304 视为命中缓存。
+
+    refresh=True 时跳过缓存直接请求，用于手动重跑；raw=True 时请求原始内容并返回文本。
+    """
+
+    key = cache_key(owner, repo, f"{endpoint}:raw" if raw else endpoint)
+    entry = None if refresh else _CACHE.get(key)
+    if entry is not None and is_fresh(entry):
+        return 200, entry.get("data")
+
+    headers = _get_headers(token)
+    if raw:
+        headers["Accept"] = RAW_MEDIA_TYPE
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    url = f"{GITHUB_API}/repos/{owner}/{repo}" + (f"/{endpoint}" if endpoint else "")
+    with GH_SEM:
+        resp = _SESSION.get(url, headers=headers, params=params, timeout=10)
+    if resp.status_code == 304 and entry is not None:
+        _CACHE.touch(key, entry, ttl)
+        return 200, entry.get("data")
     if resp.status_code != 200:
-        logger.warning("GitHub API 获取失败 %s -> %s", url, resp.status_code)
+        return resp.status_code, None
+    data = resp.text if raw else parse_json(resp)
+    _CACHE.set(key, data, resp.headers.get("ETag"), ttl)
+    return 200, data
+
+
+def fetch_repo_metadata(url: str, token: Optional[str], refresh: bool = False):
+    owner, repo = _split_repo(url)
+    status, data = _cached_get(owner, repo, "", token, META_TTL, refresh=refresh)
+    if status != 200:
+        logger.warning("GitHub API 获取失败 %s -> %s", url, status)
         return None
-    return resp.json()
+    return data
 
 
-def fetch_latest_commit_date(owner: str, repo: str, token: Optional[str]) -> Optional[str]:
-    resp = requests.get(
-        f"{GITHUB_API}/repos/{owner}/{repo}/commits",
-        headers=_get_headers(token),
-        params={"per_page": 1},
-        timeout=10,
+def fetch_latest_commit_date(owner: str, repo: str, token: Optional[str], refresh: bool = False) -> Optional[str]:
+    status, items = _cached_get(
+        owner, repo, "commits", token, COMMITS_TTL, params={"per_page": 1}, refresh=refresh
     )
-    if resp.status_code != 200:
-        return None
-    items = resp.json()
-    if not items:
+    if status != 200 or not items:
         return None
     return items[0].get("commit", {}).get("author", {}).get("date")
 
 
-def fetch_readme(owner: str, repo: str, token: Optional[str]) -> str:
-    resp = requests.get(
-        f"{GITHUB_API}/repos/{owner}/{repo}/readme",
-        headers=_get_headers(token),
-        timeout=10,
-    )
-    if resp.status_code != 200:
+def fetch_readme(owner: str, repo: str, token: Optional[str], refresh: bool = False) -> str:
+    # 直接取原始 README，省去 base64 JSON 包装与解码
+    status, text = _cached_get(owner, repo, "readme", token, README_TTL, refresh=refresh, raw=True)
+    if status != 200:
         return ""
-    content = resp.json().get("content", "")
-    import base64
+    return text or ""
 
-    try:
-        return base64.b64decode(content).decode("utf-8", errors="ignore")
-    except Exception:
-        return ""
 
-
-def _check_code_files(owner: str, repo: str, token: Optional[str]) -> bool:
-    resp = requests.get(
-        f"{GITHUB_API}/repos/{owner}/{repo}/contents",
-        headers=_get_headers(token),
-        timeout=10,
-    )
-    if resp.status_code != 200:
+def _check_code_files(owner: str, repo: str, token: Optional[str], refresh: bool = False) -> bool:
+    # git/trees 只返回路径与类型，比 contents 的根目录列表体积小得多
+    status, data = _cached_get(owner, repo, "git/trees/HEAD", token, TREE_TTL, refresh=refresh)
+    if status != 200 or not data:
         return False
-    data = resp.json()
-    allowed_ext = {".py", ".ipynb", ".cc", ".cpp", ".cu", ".js", ".java"}
-    for item in data:
-        name = item.get("name", "").lower()
-        if any(name.endswith(ext) for ext in allowed_ext):
+    for item in data.get("tree", []):
+        if item.get("type") == "blob" and item.get("path", "").lower().endswith(CODE_EXTENSIONS):
             return True
     return False
 
 
-def verify_repo(url: str, token: Optional[str], llm: Optional[LLMClient], paper_date: Optional[str]):
-    meta = fetch_repo_metadata(url, token)
+def gather_repo_info(
+    url: str,
+    token: Optional[str],
+    paper_date: Optional[str],
+    refresh: bool = False,
+) -> Dict:
+    """拉取仓库的 GitHub 侧信息并给出初步状态，README 文本留给 LLM 批量判定。"""
+
+    info = _gather_repo(url, token, bool(paper_date), refresh=refresh)
+    info["status"] = _check_commit_date(info["status"], info["last_commit"], paper_date)
+    return info
+
+
+def _gather_repo(url: str, token: Optional[str], fetch_commits: bool, refresh: bool = False) -> Dict:
+    """仓库级信息，与具体论文无关，可在引用同一仓库的论文之间复用。"""
+
+    meta = fetch_repo_metadata(url, token, refresh=refresh)
     if not meta:
         return {
+            "url": url,
             "status": "None",
             "has_readme": False,
             "has_code": False,
             "last_commit": None,
+            "readme_text": "",
+        }
+    # 空仓库：元数据已足以判定为占位，无需再请求其他端点
+    if meta.get("size", 0) == 0:
+        return {
+            "url": url,
+            "status": "Placeholder",
+            "has_readme": False,
+            "has_code": False,
+            "last_commit": meta.get("pushed_at"),
+            "readme_text": "",
         }
-    owner, repo = url.rstrip("/").split("github.com/")[-1].split("/")[:2]
+    owner, repo = _split_repo(url)
     has_readme = meta.get("size", 0) > 0
-    last_commit = fetch_latest_commit_date(owner, repo, token) or meta.get("pushed_at")
-    has_code = _check_code_files(owner, repo, token)
+    # GitHub 未识别出任何语言时视为无代码，此时状态必为占位，README 也不必再取
+    detected_code = meta.get("language") is not None
+    # 元数据确认仓库存在后，其余端点按需并发请求；提交日期仅用于与论文日期比对
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        commit_future = pool.submit(fetch_latest_commit_date, owner, repo, token, refresh) if fetch_commits else None
+        code_future = pool.submit(_check_code_files, owner, repo, token, refresh) if detected_code else None
+        readme_future = pool.submit(fetch_readme, owner, repo, token, refresh) if detected_code else None
+    last_commit = (commit_future.result() if commit_future else None) or meta.get("pushed_at")
+    has_code = code_future.result() if code_future else False
     status = "Verified" if has_code and has_readme else "Placeholder"
 
-    if paper_date and last_commit:
-        try:
-            paper_dt = datetime.fromisoformat(paper_date.replace("Z", "+00:00"))
-            repo_dt = datetime.fromisoformat(last_commit.replace("Z", "+00:00"))
-            if abs((repo_dt - paper_dt).days) > 180:
-                status = "Placeholder"
-        except Exception:
-            pass
-
     readme_text = ""
     try:
-        readme_text = fetch_readme(owner, repo, token)
+        readme_text = readme_future.result() if readme_future else ""
     except Exception:
         readme_text = ""
-    if llm and readme_text:
-        llm.register_tool(
-            ToolSpec(
-                name="check_placeholder",
-                description="判断 README 是否为占位符",
-                input_schema={"type": "object", "properties": {"text": {"type": "string"}}},
-                handler=lambda args: {"placeholder": llm.check_repo_placeholder(args.get("text", ""))},
-            )
-        )
-        result = llm.run_tool_plan("判断 README 是否占位符", {"text": readme_text})
-        calls = []
-        if isinstance(result, dict):
-            calls = result.get("calls") or result.get("results") or []
-        elif isinstance(result, list):
-            calls = result
-        for r in calls:
-            if isinstance(r, dict) and r.get("result", {}).get("placeholder"):
-                status = "Placeholder"
-                break
 
     return {
+        "url": url,
         "status": status,
         "has_readme": has_readme,
         "has_code": has_code,
         "last_commit": last_commit,
+        "readme_text": readme_text,
     }
+
+
+def _check_commit_date(status: str, last_commit: Optional[str], paper_date: Optional[str]) -> str:
+    """最近提交与论文日期相差超过 180 天时视为占位。"""
+
+    if status == "Verified" and paper_date and last_commit:
+        try:
+            paper_dt = datetime.fromisoformat(paper_date.replace("Z", "+00:00"))
+            repo_dt = datetime.fromisoformat(last_commit.replace("Z", "+00:00"))
+            if abs((repo_dt - paper_dt).days) > 180:
+                return "Placeholder"
+        except Exception:
+            pass
+    return status
+
+
+def finalize_status(info: Dict, placeholder_map: Dict[str, bool]) -> Dict:
+    status = info["status"]
+    if status != "None" and placeholder_map.get(info["url"]):
+        status = "Placeholder"
+    return {
+        "status": status,
+        "has_readme": info["has_readme"],
+        "has_code": info["has_code"],
+        "last_commit": info["last_commit"],
+    }
+
+
+def _check_placeholders(infos: List[Dict], llm: Optional[LLMClient]) -> Dict[str, bool]:
+    """按 URL 去重后一次性交给 LLM 判定占位 README，只发送开头部分。"""
+
+    if not llm:
+        return {}
+    readmes: Dict[str, str] = {}
+    for info in infos:
+        if info["status"] != "None" and info["readme_text"]:
+            readmes.setdefault(info["url"], info["readme_text"][:README_PROMPT_CHARS])
+    if not readmes:
+        return {}
+    return llm.batch_check_placeholders(list(readmes.items()))
+
+
+def verify_repo(
+    url: str,
+    token: Optional[str],
+    llm: Optional[LLMClient],
+    paper_date: Optional[str],
+    refresh: bool = False,
+):
+    info = gather_repo_info(url, token, paper_date, refresh=refresh)
+    return finalize_status(info, _check_placeholders([info], llm))
+
+
+def verify_many(
+    items: List[Tuple[str, Optional[str]]],
+    token: Optional[str],
+    llm: Optional[LLMClient],
+    refresh: bool = False,
+    max_workers: int = MAX_CONCURRENT_REPOS,
+    db_path: Optional[str] = None,
+    cache_days: float = REPO_CACHE_DAYS,
+) -> List[Dict]:
+    """并发核验多个 (url, paper_date)，README 占位判定合并为批量 LLM 调用，结果顺序与输入一致。
+
+    同一仓库只核验一次；传入 db_path 时先查 repo_cache，命中且未过期的仓库不再请求 GitHub/LLM。
+    """
+
+    if not items:
+        return []
+
+    needs_commits: Dict[str, bool] = {}
+    for url, paper_date in items:
+        key = normalize_repo_url(url)
+        needs_commits[key] = needs_commits.get(key, False) or bool(paper_date)
+    repos: Dict[str, Dict] = {}
+    if db_path and not refresh:
+        repos = db.fetch_repo_cache(db_path, list(needs_commits), cache_days)
+    todo = [url for url in needs_commits if url not in repos]
+
+    def _one(url: str) -> Dict:
+        try:
+            return _gather_repo(url, token, needs_commits[url], refresh=refresh)
+        except Exception as exc:
+            logger.warning("仓库核验失败 %s: %s", url, exc)
+            return {
+                "url": url,
+                "status": "None",
+                "has_readme": False,
+                "has_code": False,
+                "last_commit": None,
+                "readme_text": "",
+            }
+
+    if todo:
+        logger.info("核验 %d 个仓库（缓存命中 %d 个）", len(todo), len(repos))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(todo))) as pool:
+            infos = list(pool.map(_one, todo))
+        placeholder_map = _check_placeholders(infos, llm)
+        fetched = {info["url"]: finalize_status(info, placeholder_map) for info in infos}
+        if db_path:
+            # 取不到元数据可能只是限流或网络抖动，不写入缓存
+            db.save_repo_cache(db_path, {url: r for url, r in fetched.items() if r["status"] != "None"})
+        repos.update(fetched)
+
+    results = []
+    for url, paper_date in items:
+        repo = repos[normalize_repo_url(url)]
+        results.append(dict(repo, status=_check_commit_date(repo["status"], repo["last_commit"], paper_date)))
+    return results
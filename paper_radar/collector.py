@@ -1,15 +1,32 @@
 """多源论文采集：OpenReview -> 官网 -> arXiv 级联。"""
 
 import logging
-from typing import Dict, List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 
-import requests
+import soupsieve
 from bs4 import BeautifulSoup
 
 from paper_radar.arxiv_client import search_arxiv
+from paper_radar.http_utils import build_session, parse_json
 
 logger = logging.getLogger(__name__)
 
+OPENREVIEW_PROFILES_API = "https://api.openreview.net/profiles"
+# /profiles 一次最多合并的 id 数与并发请求数
+PROFILE_BATCH_SIZE = 20
+PROFILE_MAX_WORKERS = 16
+
+_SESSION = build_session()
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _title_key(title: str) -> str:
+    """标题去重键：casefold + 折叠空白，兼容不同来源的换行与大小写差异。"""
+
+    return _WHITESPACE.sub(" ", title.casefold()).strip()
+
 
 def _normalize(paper: Dict, conference: str, year: int, source: str) -> Dict:
     paper.setdefault("affiliations", "")
@@ -28,18 +45,22 @@ def fetch_openreview(conf) -> List[Dict]:
         "limit": conf.openreview.limit or 200,
     }
     try:
-        resp = requests.get(url, params=params, timeout=20)
+        resp = _SESSION.get(url, params=params, timeout=20)
         resp.raise_for_status()
-        notes = resp.json().get("notes", [])
+        notes = parse_json(resp).get("notes", [])
     except Exception as exc:
         logger.warning("OpenReview 获取失败 %s: %s", conf.name, exc)
         return []
 
+    # 先汇总全部作者一次性批量拉取机构，避免逐篇逐人请求
+    all_author_ids = [aid for n in notes for aid in (n.get("content", {}).get("authorids") or [])]
+    institutions = _fetch_institutions(all_author_ids)
+
     papers: List[Dict] = []
     for n in notes:
         content = n.get("content", {})
         author_ids = content.get("authorids") or []
-        affiliations = fetch_openreview_affiliations(author_ids)
+        affiliations = [institutions[aid] for aid in author_ids if institutions.get(aid)]
         papers.append(
             {
                 "title": content.get("title", ""),
@@ -55,50 +76,121 @@ def fetch_openreview(conf) -> List[Dict]:
     return papers
 
 
+def _latest_institution(profile: Dict) -> Optional[str]:
+    history = profile.get("content", {}).get("history", [])
+    if not history:
+        return None
+    inst = history[-1].get("institution")
+    if isinstance(inst, dict):
+        return inst.get("name") or inst.get("domain")
+    return inst
+
+
+def _fetch_profile_batch(ids: List[str]) -> Dict[str, str]:
+    """一次请求合并多个 ~Tilde id，按 profile id 及其别名回填机构。"""
+
+    result: Dict[str, str] = {}
+    try:
+        resp = _SESSION.get(OPENREVIEW_PROFILES_API, params={"ids": ",".join(ids)}, timeout=10)
+        resp.raise_for_status()
+        profiles = parse_json(resp).get("profiles", [])
+    except Exception as exc:
+        logger.debug("OpenReview 机构批量拉取失败 %s: %s", ids, exc)
+        return result
+    wanted = set(ids)
+    for profile in profiles:
+        name = _latest_institution(profile)
+        if not name:
+            continue
+        aliases = {profile.get("id")}
+        aliases.update(n.get("username") for n in profile.get("content", {}).get("names", []) if isinstance(n, dict))
+        for alias in aliases & wanted:
+            result[alias] = name
+    return result
+
+
+def _fetch_profile_single(aid: str) -> Dict[str, str]:
+    try:
+        resp = _SESSION.get(OPENREVIEW_PROFILES_API, params={"id": aid}, timeout=10)
+        resp.raise_for_status()
+        profiles = parse_json(resp).get("profiles", [])
+        name = _latest_institution(profiles[0]) if profiles else None
+        return {aid: name} if name else {}
+    except Exception as exc:
+        logger.debug("OpenReview 机构拉取失败 %s: %s", aid, exc)
+        return {}
+
+
+def _fetch_institutions(author_ids: Iterable[str]) -> Dict[str, str]:
+    """并发拉取作者机构，返回 author_id -> 机构名。
+
+    ~Tilde id 按 PROFILE_BATCH_SIZE 合并为一次请求；邮箱等其他 id 仍逐个查询。
+    """
+
+    unique_ids = list(dict.fromkeys(aid for aid in author_ids if aid))
+    if not unique_ids:
+        return {}
+    tilde_ids = [aid for aid in unique_ids if aid.startswith("~")]
+    other_ids = [aid for aid in unique_ids if not aid.startswith("~")]
+    tasks = [
+        (_fetch_profile_batch, tilde_ids[i : i + PROFILE_BATCH_SIZE])
+        for i in range(0, len(tilde_ids), PROFILE_BATCH_SIZE)
+    ]
+    tasks.extend((_fetch_profile_single, aid) for aid in other_ids)
+
+    institutions: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=min(PROFILE_MAX_WORKERS, len(tasks))) as pool:
+        for partial in pool.map(lambda task: task[0](task[1]), tasks):
+            institutions.update(partial)
+    return institutions
+
+
+def _compile_selector(selector: Optional[str]):
+    return soupsieve.compile(selector) if selector else None
+
+
+def _select_text(item, selector) -> str:
+    el = selector.select_one(item)
+    return el.get_text(" ", strip=True) if el else ""
+
+
+def _select_href(item, selector) -> Optional[str]:
+    if not selector:
+        return None
+    el = selector.select_one(item)
+    return el.get("href") if el else None
+
+
 def fetch_official_site(conf) -> List[Dict]:
     site = conf.official_site
     if not site or not site.list_url:
         return []
     try:
-        resp = requests.get(site.list_url, timeout=20)
+        resp = _SESSION.get(site.list_url, timeout=20)
         resp.raise_for_status()
     except Exception as exc:
         logger.warning("官网抓取失败 %s: %s", conf.name, exc)
         return []
-    soup = BeautifulSoup(resp.text, "html.parser")
-    items = soup.select(site.item_selector or "li")
+    soup = BeautifulSoup(resp.content, "lxml")
+    # 选择器每个会议只编译一次，循环内直接复用
+    title_sel = _compile_selector(site.title_selector)
+    authors_sel = _compile_selector(site.authors_selector)
+    abstract_sel = _compile_selector(site.abstract_selector)
+    pdf_sel = _compile_selector(site.pdf_selector)
+    supp_sel = _compile_selector(site.supplemental_selector)
+    aff_sel = _compile_selector(site.affiliations_selector)
+    items = _compile_selector(site.item_selector or "li").select(soup)
     papers: List[Dict] = []
     for item in items:
-        title_el = item.select_one(site.title_selector or "") if site.title_selector else item
+        title_el = title_sel.select_one(item) if title_sel else item
         title = (title_el.get_text(" ", strip=True) if title_el else "").strip()
         if not title:
             continue
-        authors = ""
-        if site.authors_selector:
-            authors_el = item.select_one(site.authors_selector)
-            authors = authors_el.get_text(" ", strip=True) if authors_el else ""
-        else:
-            authors = getattr(item, "attrs", {}).get("data-authors", "")
-        abstract = ""
-        if site.abstract_selector:
-            abstract_el = item.select_one(site.abstract_selector)
-            abstract = abstract_el.get_text(" ", strip=True) if abstract_el else ""
-        else:
-            abstract = getattr(item, "attrs", {}).get("data-abstract", "")
-        pdf_url = None
-        if site.pdf_selector:
-            pdf_link = item.select_one(site.pdf_selector)
-            pdf_url = pdf_link.get("href") if pdf_link else None
-        supp_url = None
-        if site.supplemental_selector:
-            supp_link = item.select_one(site.supplemental_selector)
-            supp_url = supp_link.get("href") if supp_link else None
-        affiliations = ""
-        if site.affiliations_selector:
-            aff_el = item.select_one(site.affiliations_selector)
-            affiliations = aff_el.get_text(" ", strip=True) if aff_el else ""
-        else:
-            affiliations = getattr(item, "attrs", {}).get("data-affiliations", "")
+        authors = _select_text(item, authors_sel) if authors_sel else item.attrs.get("data-authors", "")
+        abstract = _select_text(item, abstract_sel) if abstract_sel else item.attrs.get("data-abstract", "")
+        pdf_url = _select_href(item, pdf_sel)
+        supp_url = _select_href(item, supp_sel)
+        affiliations = _select_text(item, aff_sel) if aff_sel else item.attrs.get("data-affiliations", "")
         papers.append(
             {
                 "title": title,
@@ -139,36 +231,17 @@ def collect_papers(conf, monitoring, categories: List[str], keywords: List[str])
         else:
             continue
 
-        normalized = [_normalize(p, conf.name, conf.year, source) for p in papers]
-        for p in normalized:
-            title_key = p.get("title", "").lower()
-            if title_key and title_key not in seen_titles:
-                seen_titles.add(title_key)
-                collected.append(p)
+        # 先判重再规范化，重复条目不再做无用的 dict 更新
+        for p in papers:
+            title_key = _title_key(p.get("title") or "")
+            if not title_key or title_key in seen_titles:
+                continue
+            seen_titles.add(title_key)
+            collected.append(_normalize(p, conf.name, conf.year, source))
 
     return collected
+
+
 def fetch_openreview_affiliations(author_ids):
-    affs = []
-    for aid in author_ids or []:
-        try:
-            resp = requests.get(
-                "https://api.openreview.net/profiles", params={"id": aid}, timeout=10
-            )
-            resp.raise_for_status()
-            profiles = resp.json().get("profiles", [])
-            if not profiles:
-                continue
-            history = profiles[0].get("content", {}).get("history", [])
-            if not history:
-                continue
-            latest = history[-1]
-            inst = latest.get("institution")
-            if isinstance(inst, dict):
-                name = inst.get("name") or inst.get("domain")
-            else:
-                name = inst
-            if name:
-                affs.append(name)
-        except Exception as exc:
-            logger.debug("OpenReview 机构拉取失败 %s: %s", aid, exc)
-    return affs
+    institutions = _fetch_institutions(author_ids or [])
+    return [institutions[aid] for aid in author_ids or [] if institutions.get(aid)]
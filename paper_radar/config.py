@@ -4,6 +4,11 @@ from typing import List, Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译 libyaml 时退回纯 Python 实现
+    from yaml import SafeLoader
+
 
 @dataclass
 class ConferenceConfig:
@@ -40,6 +45,8 @@ class MonitoringConfig:
     ccf_repo_dir: str
     arxiv_max_results: int
     arxiv_batch_days: int
+    repo_cache_days: float = 7
+    max_parallel_conferences: int = 4
 
 
 @dataclass
@@ -47,6 +54,9 @@ class LLMConfig:
     provider: str
     model: str
     max_batch_size: int
+    max_concurrency: int = 8
+    batch_api_threshold: int = 0
+    batch_api_max_wait_hours: float = 24
 
 
 @dataclass
@@ -81,7 +91,7 @@ def load_config(path: str = "config.yml") -> AppConfig:
     if not os.path.exists(path):
         raise FileNotFoundError(f"找不到配置文件 {path}，请先复制 config.yml.example")
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=SafeLoader)
     conferences = []
     for c in data.get("conferences", []):
         openreview_cfg = c.get("openreview")
@@ -1,4 +1,7 @@
+import atexit
+import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Iterable, List, Optional, Tuple
@@ -78,17 +81,107 @@ SCHEMA = [
         UNIQUE(paper_id, url)
     );
     """,
+    """
+    CREATE TABLE IF NOT EXISTS repo_cache (
+        url TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        last_commit TEXT,
+        has_readme INTEGER,
+        has_code INTEGER,
+        fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS site_build (
+        conference TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        built_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY(conference, year)
+    );
+    """,
+    # papers(conference, year)、summaries(paper_id)、code_links(paper_id) 已由 UNIQUE 约束的最左前缀覆盖
+    """
+    CREATE INDEX IF NOT EXISTS idx_clusters_conf_year_label ON clusters(conference, year, label, paper_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_papers_with_abstract ON papers(conference, year) WHERE abstract IS NOT NULL;
+    """,
+    # 旧库 clusters 无唯一约束：先去重（保留最新一条）再建唯一索引，供 save_clusters 做 upsert
+    """
+    DELETE FROM clusters WHERE id NOT IN (
+        SELECT MAX(id) FROM clusters GROUP BY conference, year, paper_id
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_clusters_conf_year_paper ON clusters(conference, year, paper_id);
+    """,
 ]
 
 
+# 每个线程、每个数据库文件复用一个长连接，避免每次调用 connect/close；
+# WAL 模式下各线程的读连接互不阻塞
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+_local = threading.local()
+_ALL_CONNS: List[sqlite3.Connection] = []
+_GENERATION = 0
+_LOCK = threading.Lock()
+
+
+def _state():
+    if getattr(_local, "generation", None) != _GENERATION:
+        _local.generation = _GENERATION
+        _local.conns = {}
+    return _local
+
+
+def _get(db_path: str) -> sqlite3.Connection:
+    state = _state()
+    conn = state.conns.get(db_path)
+    if conn is None:
+        # 多个会议并发写库时，等待其他线程的写事务而不是立即报 database is locked
+        conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        state.conns[db_path] = conn
+        with _LOCK:
+            _ALL_CONNS.append(conn)
+    return conn
+
+
 @contextmanager
 def get_conn(db_path: str):
-    conn = sqlite3.connect(db_path)
+    """借出当前线程的连接，代码块正常结束时提交，异常时回滚。"""
+
+    conn = _get(db_path)
     try:
         yield conn
         conn.commit()
-    finally:
-        conn.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def close_db():
+    """提交并关闭所有线程的连接，同时让 WAL 回写到主库文件。"""
+
+    global _GENERATION
+    with _LOCK:
+        for conn in _ALL_CONNS:
+            try:
+                conn.commit()
+                conn.close()
+            except sqlite3.ProgrammingError:
+                continue
+        _ALL_CONNS.clear()
+        _GENERATION += 1
+
+
+atexit.register(close_db)
 
 
 def init_db(db_path: str):
@@ -107,32 +200,37 @@ def upsert_conference(db_path: str, name: str, year: int, deadline: Optional[str
 
 
 def insert_papers(db_path: str, records: List[Dict]):
+    rows = [
+        (
+            rec.get("conference"),
+            rec.get("year"),
+            rec.get("source"),
+            rec.get("title"),
+            rec.get("authors"),
+            rec.get("affiliations"),
+            rec.get("abstract"),
+            rec.get("pdf_url"),
+            rec.get("supplemental_url"),
+            rec.get("arxiv_id"),
+            rec.get("keywords"),
+        )
+        for rec in records
+    ]
     with get_conn(db_path) as conn:
-        for rec in records:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO papers (
-                    conference, year, source, title, authors, affiliations, abstract,
-                    pdf_url, supplemental_url, arxiv_id, keywords
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    rec.get("conference"),
-                    rec.get("year"),
-                    rec.get("source"),
-                    rec.get("title"),
-                    rec.get("authors"),
-                    rec.get("affiliations"),
-                    rec.get("abstract"),
-                    rec.get("pdf_url"),
-                    rec.get("supplemental_url"),
-                    rec.get("arxiv_id"),
-                    rec.get("keywords"),
-                ),
-            )
-
-
-def fetch_papers_without_summary(db_path: str, conference: str, year: int, limit: int) -> List[Tuple]:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO papers (
+                conference, year, source, title, authors, affiliations, abstract,
+                pdf_url, supplemental_url, arxiv_id, keywords
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+def fetch_papers_without_summary(
+    db_path: str, conference: str, year: int, limit: Optional[int] = None
+) -> List[Tuple]:
     with get_conn(db_path) as conn:
         cur = conn.execute(
             """
@@ -142,28 +240,36 @@ def fetch_papers_without_summary(db_path: str, conference: str, year: int, limit
             WHERE p.conference=? AND p.year=? AND s.id IS NULL AND p.abstract IS NOT NULL
             LIMIT ?
             """,
-            (conference, year, limit),
+            (conference, year, -1 if limit is None else limit),
         )
         return cur.fetchall()
 
 
 def save_summaries(db_path: str, summaries: List[Tuple[int, str, str]]):
     with get_conn(db_path) as conn:
-        for paper_id, tldr_en, tldr_zh in summaries:
-            conn.execute(
-                "INSERT OR REPLACE INTO summaries (paper_id, tldr_en, tldr_zh) VALUES (?, ?, ?)",
-                (paper_id, tldr_en, tldr_zh),
-            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO summaries (paper_id, tldr_en, tldr_zh) VALUES (?, ?, ?)",
+            summaries,
+        )
 
 
 def save_clusters(db_path: str, conference: str, year: int, assignments: List[Tuple[int, str]]):
     with get_conn(db_path) as conn:
-        conn.execute("DELETE FROM clusters WHERE conference=? AND year=?", (conference, year))
-        for paper_id, label in assignments:
-            conn.execute(
-                "INSERT INTO clusters (conference, year, label, paper_id) VALUES (?, ?, ?, ?)",
-                (conference, year, label, paper_id),
-            )
+        # 本次结果未覆盖的论文删除旧标签，与原先整体重写的语义一致；其余行原地 upsert
+        conn.execute(
+            """
+            DELETE FROM clusters
+            WHERE conference=? AND year=? AND paper_id NOT IN (SELECT value FROM json_each(?))
+            """,
+            (conference, year, json.dumps([paper_id for paper_id, _ in assignments])),
+        )
+        conn.executemany(
+            """
+            INSERT INTO clusters (conference, year, label, paper_id) VALUES (?, ?, ?, ?)
+            ON CONFLICT(conference, year, paper_id) DO UPDATE SET label=excluded.label
+            """,
+            [(conference, year, label, paper_id) for paper_id, label in assignments],
+        )
 
 
 def save_trend(db_path: str, conference: str, year: int, summary: str):
@@ -187,6 +293,39 @@ def fetch_papers(db_path: str, conference: str, year: int) -> List[Dict]:
         return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
+def fetch_conference_rows(db_path: str, conference: str, year: int) -> List[Dict]:
+    """一次 JOIN 取出会议页所需的论文、摘要、主题与代码链接；有多个代码链接的论文会对应多行。"""
+
+    with get_conn(db_path) as conn:
+        cur = conn.execute(
+            """
+            SELECT p.id, p.title, p.authors, p.affiliations, p.abstract, p.pdf_url, p.supplemental_url,
+                   p.arxiv_id, p.keywords, p.created_at,
+                   s.id AS summary_id, s.tldr_en, s.tldr_zh,
+                   c.label,
+                   cl.url AS code_url, cl.status AS code_status, cl.last_commit, cl.has_readme, cl.has_code
+            FROM papers p
+            LEFT JOIN summaries s ON s.paper_id = p.id
+            LEFT JOIN clusters c ON c.paper_id = p.id AND c.conference = p.conference AND c.year = p.year
+            LEFT JOIN code_links cl ON cl.paper_id = p.id
+            WHERE p.conference=? AND p.year=?
+            ORDER BY p.id, cl.id
+            """,
+            (conference, year),
+        )
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def fetch_trend(db_path: str, conference: str, year: int) -> Optional[str]:
+    with get_conn(db_path) as conn:
+        row = conn.execute(
+            "SELECT summary FROM trends WHERE conference=? AND year=?",
+            (conference, year),
+        ).fetchone()
+        return row[0] if row else None
+
+
 def save_code_link(db_path: str, paper_id: int, url: str, status: str, last_commit: Optional[str], has_readme: bool, has_code: bool):
     with get_conn(db_path) as conn:
         conn.execute(
@@ -198,6 +337,24 @@ def save_code_link(db_path: str, paper_id: int, url: str, status: str, last_comm
         )
 
 
+def save_code_links_bulk(
+    db_path: str, rows: Iterable[Tuple[int, str, str, Optional[str], bool, bool]]
+):
+    """rows 为 (paper_id, url, status, last_commit, has_readme, has_code)，一次 executemany 写入。"""
+
+    with get_conn(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO code_links (paper_id, url, status, last_commit, has_readme, has_code)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (paper_id, url, status, last_commit, int(has_readme), int(has_code))
+                for paper_id, url, status, last_commit, has_readme, has_code in rows
+            ],
+        )
+
+
 def fetch_code_links(db_path: str, paper_id: int) -> List[Dict]:
     with get_conn(db_path) as conn:
         cur = conn.execute(
@@ -208,6 +365,43 @@ def fetch_code_links(db_path: str, paper_id: int) -> List[Dict]:
         return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
+def fetch_repo_cache(db_path: str, urls: List[str], max_age_days: float) -> Dict[str, Dict]:
+    """取出 max_age_days 内核验过的仓库结果，返回 url -> {status, last_commit, has_readme, has_code}。"""
+
+    # URL 列表整体作为一个 JSON 参数传入：SQL 文本固定，可复用预编译语句，也不受绑定变量个数限制
+    results: Dict[str, Dict] = {}
+    with get_conn(db_path) as conn:
+        cur = conn.execute(
+            """
+            SELECT url, status, last_commit, has_readme, has_code FROM repo_cache
+            WHERE url IN (SELECT value FROM json_each(?)) AND fetched_at >= datetime('now', ?)
+            """,
+            (json.dumps(urls), f"-{max_age_days} days"),
+        )
+        for url, status, last_commit, has_readme, has_code in cur.fetchall():
+            results[url] = {
+                "status": status,
+                "has_readme": bool(has_readme),
+                "has_code": bool(has_code),
+                "last_commit": last_commit,
+            }
+    return results
+
+
+def save_repo_cache(db_path: str, repos: Dict[str, Dict]):
+    with get_conn(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO repo_cache (url, status, last_commit, has_readme, has_code)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (url, r["status"], r["last_commit"], int(r["has_readme"]), int(r["has_code"]))
+                for url, r in repos.items()
+            ],
+        )
+
+
 def fetch_cluster_counts(db_path: str, conference: str, year: int) -> List[Tuple[str, int]]:
     with get_conn(db_path) as conn:
         cur = conn.execute(
@@ -217,6 +411,23 @@ def fetch_cluster_counts(db_path: str, conference: str, year: int) -> List[Tuple
         return cur.fetchall()
 
 
+def fetch_site_hash(db_path: str, conference: str, year: int) -> Optional[str]:
+    with get_conn(db_path) as conn:
+        row = conn.execute(
+            "SELECT content_hash FROM site_build WHERE conference=? AND year=?",
+            (conference, year),
+        ).fetchone()
+        return row[0] if row else None
+
+
+def save_site_hash(db_path: str, conference: str, year: int, content_hash: str):
+    with get_conn(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO site_build (conference, year, content_hash) VALUES (?, ?, ?)",
+            (conference, year, content_hash),
+        )
+
+
 def mark_conference_triggered(db_path: str, name: str, year: int):
     with get_conn(db_path) as conn:
         conn.execute(
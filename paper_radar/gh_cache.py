@@ -0,0 +1,103 @@
+"""GitHub API 响应缓存：内存 TTL + 磁盘 JSON 持久化，配合 ETag 条件请求复用结果。"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path.home() / ".paper_radar-cache"
+
+
+def cache_key(owner: str, repo: str, endpoint: str) -> str:
+    return hashlib.sha256(f"{owner}/{repo}:{endpoint}".encode("utf-8")).hexdigest()
+
+
+def is_fresh(entry: Dict) -> bool:
+    return time.time() - entry.get("timestamp", 0) < entry.get("ttl", 0)
+
+
+class MemoryCache:
+    """进程内 TTL 缓存，条目格式为 {data, etag, timestamp, ttl}。"""
+
+    def __init__(self):
+        self._store: Dict[str, Dict] = {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._store.get(key)
+
+    def set(self, key: str, entry: Dict):
+        self._store[key] = entry
+
+    def delete(self, key: str):
+        self._store.pop(key, None)
+
+    def clear(self):
+        self._store.clear()
+
+
+class FileCache:
+    """按 key 落盘为 JSON 文件，跨进程/跨运行复用 ETag。"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            logger.debug("缓存文件读取失败 %s: %s", path, exc)
+            return None
+
+    def set(self, key: str, entry: Dict):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as exc:
+            logger.debug("缓存文件写入失败 %s: %s", key, exc)
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class GitHubCache:
+    """两级缓存：先查内存，未命中再读磁盘并回填内存。"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.memory = MemoryCache()
+        self.disk = FileCache(cache_dir)
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def set(self, key: str, data: Any, etag: Optional[str], ttl: float):
+        entry = {"data": data, "etag": etag, "timestamp": time.time(), "ttl": ttl}
+        self.memory.set(key, entry)
+        self.disk.set(key, entry)
+
+    def touch(self, key: str, entry: Dict, ttl: float):
+        """304 命中时刷新时间戳，延长条目有效期。"""
+
+        self.set(key, entry.get("data"), entry.get("etag"), ttl)
@@ -0,0 +1,41 @@
+"""HTTP 公共工具：构建带连接池与重试的 requests.Session，供各采集模块复用长连接。"""
+
+from typing import Any, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # 未安装 orjson 时退回标准库
+    import json
+
+    _loads = json.loads
+
+RETRY_STATUS = (502, 503, 504)
+
+
+def build_session(
+    pool_connections: int = 20,
+    pool_maxsize: int = 40,
+    retries: int = 3,
+    status_forcelist: Sequence[int] = RETRY_STATUS,
+) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, backoff_factor=0.3, status_forcelist=status_forcelist),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_json(resp: requests.Response) -> Any:
+    """直接解析响应字节，优先使用 orjson。"""
+
+    return _loads(resp.content)
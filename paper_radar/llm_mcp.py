@@ -1,15 +1,97 @@
 """LLM 通信模块，优先 deepseek，提供批处理摘要、聚类与趋势总结能力，
 并实现最小 MCP 工具调用协议（注册本地工具、解析调用、返回结构化结果）。"""
 
+import hashlib
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 
-from openai import OpenAI
+from openai import OpenAI, Timeout
+
+from .gh_cache import CACHE_DIR, FileCache, is_fresh
+
+try:
+    import tiktoken
+except ImportError:  # 未安装 tiktoken 时按字符数估算 token
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 连接/读取超时与 SDK 自动重试，避免卡死的连接拖住整条流水线
+REQUEST_TIMEOUT = Timeout(60.0, connect=5.0, read=60.0, write=30.0, pool=5.0)
+MAX_RETRIES = 3
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+# 非流式请求在生成结束前不返回任何字节，读超时需随输出预算放宽；按保守的 25 token/s 估算生成耗时
+MIN_OUTPUT_TOKENS_PER_SECOND = 25
+
+
+def _request_timeout(max_tokens: int) -> Timeout:
+    read = max(REQUEST_TIMEOUT.read, 30.0 + max_tokens / MIN_OUTPUT_TOKENS_PER_SECOND)
+    return Timeout(read, connect=5.0, read=read, write=30.0, pool=5.0)
+
+# 相同 prompt 的响应在磁盘上复用，增量重建时跳过重复的 LLM 调用
+LLM_CACHE_DIR = CACHE_DIR / "llm"
+LLM_CACHE_TTL = 30 * 24 * 3600
+
+
+# Batch API：离线批处理半价但最长 24h 完成，轮询间隔指数增长
+BATCH_POLL_INITIAL = 10.0
+BATCH_POLL_MAX = 300.0
+BATCH_TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+# 单次摘要请求的输入 token 上限，超出时按累计 token 贪心切分为多个子批次
+SUMMARY_TOKEN_BUDGET = 12000
+PAPER_TOKEN_OVERHEAD = 16
+# 每篇输出约 200 token，单批篇数同时受输出上限约束
+SUMMARY_OUTPUT_TOKENS_PER_PAPER = 200
+SUMMARY_MAX_OUTPUT_TOKENS = 8000
+
+# 摘要超过 512 token 后对一句话 TLDR 几乎没有帮助，只会线性增加 prompt 长度
+ABSTRACT_MAX_TOKENS = 512
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:
+        logger.debug("tiktoken 编码加载失败，改用字符估算: %s", exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    enc = _encoding()
+    if enc is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+
+def _digest(*parts) -> str:
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
 @dataclass
 class ToolSpec:
@@ -20,57 +102,313 @@ class ToolSpec:
 
 
 class LLMClient:
-    def __init__(self, provider: str, model: str, api_key: str):
+    def __init__(self, provider: str, model: str, api_key: str, max_concurrency: int = 8):
         base_url = "https://api.deepseek.com" if provider == "deepseek" else None
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = OpenAI(
+            api_key=api_key, base_url=base_url, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES
+        )
+        self.provider = provider
         self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        # 同一客户端被多个会议共享，信号量保证全局在途请求不超过 max_concurrency
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._cache = FileCache(LLM_CACHE_DIR)
         self.tools: Dict[str, ToolSpec] = {}
 
     def register_tool(self, spec: ToolSpec):
         self.tools[spec.name] = spec
 
-    def _chat(self, messages: List[Dict], response_format: Optional[Dict] = None) -> str:
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            response_format=response_format or {"type": "text"},
-        )
-        return resp.choices[0].message.content
+    def _map_concurrent(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """并发执行多次独立的 LLM 请求，最多 max_concurrency 个同时在途，结果保持输入顺序。"""
 
-    def _chat_json(self, messages: List[Dict], force_object: bool = True) -> Optional[Dict]:
-        for _ in range(2):
-            try:
-                response_format = {"type": "json_object"} if force_object else None
-                content = self._chat(messages, response_format=response_format)
-                return json.loads(content)
-            except Exception as exc:
-                logger.warning("JSON 解析失败，重试一次: %s", exc)
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def _chat(
+        self,
+        messages: List[Dict],
+        response_format: Optional[Dict] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> str:
+        key = self._chat_key(messages, response_format, max_tokens)
+        content = self._cache_get(key) if use_cache else None
+        if content is not None:
+            return content
+        max_tokens = max_tokens or DEFAULT_MAX_OUTPUT_TOKENS
+        with self._slots:
+            resp = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format=response_format or {"type": "text"},
+                max_tokens=max_tokens,
+                timeout=_request_timeout(max_tokens),
+            )
+        content = resp.choices[0].message.content
+        if content and use_cache:
+            self._cache_set(key, content)
+        return content
+
+    def _chat_key(self, messages: List[Dict], response_format: Optional[Dict], max_tokens: Optional[int]) -> str:
+        return _digest("chat", self.model, messages, response_format, max_tokens)
+
+    def _cache_get(self, key: str):
+        entry = self._cache.get(key)
+        if entry is not None and is_fresh(entry):
+            return entry.get("data")
         return None
 
+    def _cache_set(self, key: str, data):
+        self._cache.set(key, {"data": data, "timestamp": time.time(), "ttl": LLM_CACHE_TTL})
+
+    @staticmethod
+    def _parse_json(content: str):
+        try:
+            return json.loads(content)
+        except ValueError:
+            pass
+        # 修复一次：去掉 ``` 代码块等包裹，只保留最外层 JSON
+        starts = [i for i in (content.find("["), content.find("{")) if i != -1]
+        if not starts:
+            raise ValueError("响应中没有 JSON")
+        start = min(starts)
+        end = max(content.rfind("]"), content.rfind("}"))
+        return json.loads(content[start : end + 1])
+
+    def _chat_json(
+        self,
+        messages: List[Dict],
+        force_object: bool = True,
+        max_tokens: Optional[int] = None,
+        collect: Optional[Callable[[Any], Any]] = None,
+    ):
+        """请求 JSON 响应；传入 collect 时返回其提取结果。
+
+        只有解析成功且提取出可用内容的响应才写入缓存，格式不符的缓存条目会被删除，避免重跑时一直命中坏结果。
+        网络错误由 SDK 自动重试。
+        """
+
+        response_format = {"type": "json_object"} if force_object else None
+        key = self._chat_key(messages, response_format, max_tokens)
+        cached = self._cache_get(key)
+        content = cached
+        result = None
+        try:
+            if content is None:
+                content = self._chat(
+                    messages, response_format=response_format, max_tokens=max_tokens, use_cache=False
+                )
+            data = self._parse_json(content)
+            result = collect(data) if collect else data
+        except Exception as exc:
+            logger.warning("LLM JSON 请求失败: %s", exc)
+        if result:
+            if cached is None:
+                self._cache_set(key, content)
+        elif cached is not None:
+            self._cache.delete(key)
+        return result
+
+    def _paper_key(self, title: str, abstract: str) -> str:
+        return _digest("summary", self.model, title, abstract)
+
     def batch_summarize(self, papers: List[Tuple[int, str, str]]) -> List[Tuple[int, str, str]]:
         if not papers:
             return []
+        return self.batch_summarize_many([papers])
+
+    def _split_cached(self, papers: List[Tuple[int, str, str]]):
+        """先按 (标题, 摘要) 查单篇缓存，返回 (已命中结果, 真正需要请求的新论文)。"""
+
+        results = []
+        pending = []
+        for pid, title, abstract in papers:
+            cached = self._cache_get(self._paper_key(title, abstract))
+            if cached:
+                results.append((pid, cached[0], cached[1]))
+            else:
+                pending.append((pid, title, abstract))
+        return results, pending
+
+    @staticmethod
+    def _summary_messages(papers: List[Tuple[int, str, str]]) -> List[Dict]:
+        # id 用批内序号而不是数据库主键，摘要按 token 截断，JSON 去掉多余空白
         payload = [
-            {"id": pid, "title": title, "abstract": abstract}
-            for pid, title, abstract in papers
+            {"id": i, "title": title, "abstract": truncate_tokens(abstract or "", ABSTRACT_MAX_TOKENS)}
+            for i, (_, title, abstract) in enumerate(papers)
         ]
         system = "你是资深论文助手，请逐条阅读 JSON 中的论文摘要，生成英文与中文一句话核心贡献。"
         user = (
             "请输出与输入数组等长的 JSON 数组，每个元素包含 id, tldr_en, tldr_zh，"
-            "不得遗漏任何论文，不得添加额外文本。输入数据：" + json.dumps(payload, ensure_ascii=False)
+            "不得遗漏任何论文，不得添加额外文本。输入数据："
+            + json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
         )
-        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
-        data = self._chat_json(messages, force_object=False)
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def _summarize_uncached(self, papers: List[Tuple[int, str, str]]) -> List[Tuple[int, str, str]]:
+        messages = self._summary_messages(papers)
+        return self._chat_json(
+            messages,
+            force_object=False,
+            max_tokens=SUMMARY_OUTPUT_TOKENS_PER_PAPER * len(papers) + 100,
+            collect=lambda data: self._collect_summaries(data, papers),
+        ) or []
+
+    def _collect_summaries(self, data, papers: List[Tuple[int, str, str]]) -> List[Tuple[int, str, str]]:
         if not data:
             return []
         results = []
         for item in data:
             try:
-                results.append((int(item["id"]), item.get("tldr_en", ""), item.get("tldr_zh", "")))
+                idx = int(item["id"])
+                tldr_en, tldr_zh = item.get("tldr_en", ""), item.get("tldr_zh", "")
             except Exception:
                 continue
+            # 负数下标会被 Python 解释为倒数，必须显式限定范围，丢弃模型编造的 id
+            if not 0 <= idx < len(papers):
+                continue
+            pid, title, abstract = papers[idx]
+            results.append((pid, tldr_en, tldr_zh))
+            if tldr_en or tldr_zh:
+                self._cache_set(self._paper_key(title, abstract), [tldr_en, tldr_zh])
         return results
 
+    def batch_summarize_many(
+        self, batches: List[List[Tuple[int, str, str]]], max_items: Optional[int] = None
+    ) -> List[Tuple[int, str, str]]:
+        """按 token 预算重新装批后并发请求，合并返回全部结果；max_items 为单批篇数上限。"""
+
+        results, pending_batches = self._prepare_batches(batches, max_items)
+        for batch_result in self._map_concurrent(self._summarize_uncached, pending_batches):
+            results.extend(batch_result)
+        return results
+
+    def _prepare_batches(self, batches: List[List[Tuple[int, str, str]]], max_items: Optional[int] = None):
+        """剔除已缓存的论文，并把剩余论文按 token 预算重新装批，返回 (缓存结果, 待请求批次)。"""
+
+        results: List[Tuple[int, str, str]] = []
+        pending_batches = []
+        for batch in batches:
+            cached, pending = self._split_cached(batch)
+            results.extend(cached)
+            pending_batches.extend(self._pack_by_tokens(pending, max_items))
+        return results, pending_batches
+
+    @staticmethod
+    def _pack_by_tokens(
+        papers: List[Tuple[int, str, str]], max_items: Optional[int] = None
+    ) -> List[List[Tuple[int, str, str]]]:
+        limit = (SUMMARY_MAX_OUTPUT_TOKENS - 100) // SUMMARY_OUTPUT_TOKENS_PER_PAPER
+        if max_items:
+            limit = min(limit, max_items)
+        packed: List[List[Tuple[int, str, str]]] = []
+        current: List[Tuple[int, str, str]] = []
+        used = 0
+        for paper in papers:
+            _, title, abstract = paper
+            cost = (
+                count_tokens(title or "")
+                + count_tokens(truncate_tokens(abstract or "", ABSTRACT_MAX_TOKENS))
+                + PAPER_TOKEN_OVERHEAD
+            )
+            if current and (used + cost > SUMMARY_TOKEN_BUDGET or len(current) >= limit):
+                packed.append(current)
+                current, used = [], 0
+            current.append(paper)
+            used += cost
+        if current:
+            packed.append(current)
+        return packed
+
+    @property
+    def supports_batch_api(self) -> bool:
+        # deepseek 暂无 /v1/batches 接口，只有 openai 能走离线批处理
+        return self.provider == "openai"
+
+    def batch_summarize_via_batch_api(
+        self,
+        batches: List[List[Tuple[int, str, str]]],
+        max_wait: float = 24 * 3600,
+        max_items: Optional[int] = None,
+    ) -> List[Tuple[int, str, str]]:
+        """把全部摘要批次作为一个 Batch 任务提交并轮询结果，未返回的批次回退到同步并发请求。"""
+
+        results, pending_batches = self._prepare_batches(batches, max_items)
+        if not pending_batches:
+            return results
+        try:
+            outputs = self._run_batch_job(pending_batches, max_wait)
+        except Exception as exc:
+            logger.warning("Batch API 调用失败，回退同步请求: %s", exc)
+            outputs = {}
+        leftover = []
+        for i, batch in enumerate(pending_batches):
+            data = None
+            content = outputs.get(str(i))
+            if content:
+                try:
+                    data = self._parse_json(content)
+                except ValueError:
+                    pass
+            collected = self._collect_summaries(data, batch)
+            if collected:
+                results.extend(collected)
+            else:
+                leftover.append(batch)
+        if leftover:
+            logger.info("Batch 任务缺少 %d 个批次的结果，改用同步请求", len(leftover))
+            for batch_result in self._map_concurrent(self._summarize_uncached, leftover):
+                results.extend(batch_result)
+        return results
+
+    def _run_batch_job(self, batches: List[List[Tuple[int, str, str]]], max_wait: float) -> Dict[str, str]:
+        """提交 JSONL 请求文件，等待任务结束，返回 custom_id -> 响应文本。"""
+
+        lines = []
+        for i, batch in enumerate(batches):
+            body = {
+                "model": self.model,
+                "messages": self._summary_messages(batch),
+                "max_tokens": SUMMARY_OUTPUT_TOKENS_PER_PAPER * len(batch) + 100,
+            }
+            request = {"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": body}
+            lines.append(json.dumps(request, ensure_ascii=False))
+        upload = self.client.files.create(
+            file=("summaries.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        job = self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        logger.info("已提交 Batch 任务 %s，共 %d 个请求", job.id, len(lines))
+        deadline = time.monotonic() + max_wait
+        delay = BATCH_POLL_INITIAL
+        while job.status not in BATCH_TERMINAL_STATES:
+            if time.monotonic() + delay > deadline:
+                self.client.batches.cancel(job.id)
+                raise TimeoutError(f"Batch 任务 {job.id} 等待超时")
+            time.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX)
+            job = self.client.batches.retrieve(job.id)
+        if job.status != "completed" or not job.output_file_id:
+            raise RuntimeError(f"Batch 任务 {job.id} 结束状态为 {job.status}")
+
+        outputs: Dict[str, str] = {}
+        for line in self.client.files.content(job.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            try:
+                outputs[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                continue
+        return outputs
+
     def cluster_papers(self, papers: List[Dict]) -> List[Tuple[int, str]]:
         if not papers:
             return []
@@ -80,13 +418,14 @@ class LLMClient:
             "以 JSON 数组返回，每个元素包含 id 和 label（主题名称）。"
         )
         user = "输入数据：" + json.dumps(payload, ensure_ascii=False)
-        data = self._chat_json(
+        return self._chat_json(
             [{"role": "system", "content": system}, {"role": "user", "content": user}],
             force_object=False,
-        )
-        if not data:
-            return []
-        return [(int(item.get("id")), item.get("label", "未知主题")) for item in data if item.get("id") is not None]
+            max_tokens=min(50 * len(papers) + 200, 8000),
+            collect=lambda data: [
+                (int(item.get("id")), item.get("label", "未知主题")) for item in data if item.get("id") is not None
+            ],
+        ) or []
 
     def summarize_trend(self, clusters: List[Tuple[str, int]]) -> Optional[str]:
         if not clusters:
@@ -95,7 +434,9 @@ class LLMClient:
         system = "请根据主题词频，用中文写一段 200 字左右的技术趋势总结。"
         user = "主题数据：" + json.dumps(payload, ensure_ascii=False)
         try:
-            return self._chat([{"role": "system", "content": system}, {"role": "user", "content": user}])
+            return self._chat(
+                [{"role": "system", "content": system}, {"role": "user", "content": user}], max_tokens=400
+            )
         except Exception as exc:
             logger.error("趋势总结失败: %s", exc)
             return None
@@ -107,12 +448,50 @@ class LLMClient:
         )
         try:
             result = self._chat(
-                [{"role": "system", "content": "你是严格的代码审核员，只输出 true 或 false"}, {"role": "user", "content": prompt}]
+                [{"role": "system", "content": "你是严格的代码审核员，只输出 true 或 false"}, {"role": "user", "content": prompt}],
+                max_tokens=64,
             )
             return "true" in result.lower()
         except Exception:
             return False
 
+    def batch_check_placeholders(
+        self, readmes: List[Tuple[str, str]], batch_size: int = 20
+    ) -> Dict[str, bool]:
+        """批量判断 README 是否为占位符，每 batch_size 个仓库一次请求，返回 url -> 是否占位。"""
+
+        chunks = [readmes[i : i + batch_size] for i in range(0, len(readmes), batch_size)]
+        results: Dict[str, bool] = {}
+        for partial in self._map_concurrent(self._check_placeholder_chunk, chunks):
+            results.update(partial)
+        return results
+
+    def _check_placeholder_chunk(self, chunk: List[Tuple[str, str]]) -> Dict[str, bool]:
+        system = "你是严格的代码审核员，判断每个 README 是否属于占位符（如 code coming soon、WIP、empty）。"
+        payload = [{"id": i, "text": text} for i, (_, text) in enumerate(chunk)]
+        user = (
+            '请输出 JSON 对象 {"results": [{"id": 整数, "placeholder": true/false}]}，'
+            "覆盖输入中的每一项，不得添加额外文本。输入数据：" + json.dumps(payload, ensure_ascii=False)
+        )
+        return self._chat_json(
+            [{"role": "system", "content": system}, {"role": "user", "content": user}],
+            max_tokens=32 * len(chunk) + 64,
+            collect=lambda data: self._collect_placeholders(data, chunk),
+        ) or {}
+
+    @staticmethod
+    def _collect_placeholders(data, chunk: List[Tuple[str, str]]) -> Dict[str, bool]:
+        results: Dict[str, bool] = {}
+        items = data.get("results", []) if isinstance(data, dict) else data
+        for item in items:
+            try:
+                idx = int(item["id"])
+            except Exception:
+                continue
+            if 0 <= idx < len(chunk):
+                results[chunk[idx][0]] = bool(item.get("placeholder"))
+        return results
+
     def run_tool_plan(self, task: str, payload: Dict) -> Dict:
         """最小 MCP 循环：LLM 给出工具调用计划(JSON list)，本地执行后再让 LLM 汇总。"""
 
@@ -1,41 +1,147 @@
 """PDF 相关工具：提取文本和 GitHub 链接，优先少页快速解析。"""
 
+import atexit
 import io
 import logging
+import multiprocessing
+import os
 import re
-from typing import List
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence
 
-import requests
 from pypdf import PdfReader
 
+from paper_radar.http_utils import RETRY_STATUS, build_session
+
 logger = logging.getLogger(__name__)
 
 
-GITHUB_PATTERN = re.compile(r"https?://github\.com/[\w\-\.]+/[\w\-\.]+", re.IGNORECASE)
+GITHUB_PATTERN = re.compile(r"https?://github\.com/[A-Za-z0-9_.\-]+/[A-Za-z0-9_.\-]+", re.IGNORECASE)
+# 同时下载的 PDF 数
+MAX_CONCURRENT_DOWNLOADS = 16
+# 先只下载前 2 MiB 尝试解析，不够再续读剩余部分
+PDF_PREFIX_BYTES = 2 * 1024 * 1024
+PDF_CHUNK_SIZE = 64 * 1024
+# 下载线程共享连接池，同一站点的 PDF 复用 TCP/TLS 连接；PDF 镜像站常返回 429，一并重试
+_SESSION = build_session(pool_connections=32, pool_maxsize=64, status_forcelist=(429, *RETRY_STATUS))
+
+# 全进程共享一个解析进程池，多个会议并发时不会各自拉起 cpu_count 个解释器
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        # 子进程异常退出后进程池不可再用，重新创建
+        if _PARSE_POOL is None or getattr(_PARSE_POOL, "_broken", False):
+            # spawn 避免在已有下载线程的进程里 fork
+            _PARSE_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _PARSE_POOL
+
+
+def shutdown_parse_pool():
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is not None:
+            _PARSE_POOL.shutdown(cancel_futures=True)
+            _PARSE_POOL = None
+
 
+atexit.register(shutdown_parse_pool)
+
+
+def _parse_pdf_for_github(content: bytes, max_pages: int, partial: bool = False) -> List[str]:
+    """partial=True 表示 content 只是文件前缀，页数不足 max_pages 时抛错以便续读完整文件。"""
+
+    reader = PdfReader(io.BytesIO(content))
+    if partial and len(reader.pages) < max_pages:
+        raise ValueError("PDF 前缀不足以解析所需页数")
+    text_parts = []
+    for page in reader.pages[:max_pages]:
+        try:
+            text_parts.append(page.extract_text() or "")
+        except Exception:
+            continue
+    text = "\n".join(text_parts)
+    return find_github_links(text)
+
+
+def find_github_links(text: str) -> List[str]:
+    # 绝大多数论文正文不含 GitHub 链接，先用 C 实现的子串查找快速排除，命中后才跑正则
+    if "github.com" not in text.lower():
+        return []
+    return list({m.group(0) for m in GITHUB_PATTERN.finditer(text)})
 
-def extract_github_from_pdf(pdf_url: str, max_pages: int = 3) -> List[str]:
-    """下载 PDF 并提取前 max_pages 页的 GitHub 链接。"""
+
+def _read_until(buf: io.BytesIO, chunks: Iterator[bytes], limit: Optional[int]) -> bool:
+    """把分块写入 buf，超过 limit 字节即停；返回是否已读到文件末尾。"""
+
+    for chunk in chunks:
+        buf.write(chunk)
+        if limit is not None and buf.tell() >= limit:
+            return False
+    return True
+
+
+def extract_github_from_pdf(
+    pdf_url: Optional[str], max_pages: int = 3, parse_pool: Optional[Executor] = None
+) -> List[str]:
+    """流式下载 PDF 并提取前 max_pages 页的 GitHub 链接；传入 parse_pool 时解析在该进程池中执行。"""
 
     if not pdf_url:
         return []
+
+    def _parse(content: bytes, partial: bool) -> List[str]:
+        if parse_pool is not None:
+            return parse_pool.submit(_parse_pdf_for_github, content, max_pages, partial).result()
+        return _parse_pdf_for_github(content, max_pages, partial)
+
     try:
-        resp = requests.get(pdf_url, timeout=20)
+        resp = _SESSION.get(pdf_url, stream=True, timeout=20)
         resp.raise_for_status()
     except Exception as exc:
         logger.warning("下载 PDF 失败 %s: %s", pdf_url, exc)
         return []
 
+    with resp:
+        buf = io.BytesIO()
+        chunks = resp.iter_content(chunk_size=PDF_CHUNK_SIZE)
+        try:
+            complete = _read_until(buf, chunks, PDF_PREFIX_BYTES)
+            if not complete:
+                try:
+                    return _parse(buf.getvalue(), True)
+                except Exception:
+                    # 非线性化 PDF 的交叉引用表在文件末尾，前缀无法解析时续读剩余内容
+                    _read_until(buf, chunks, None)
+        except Exception as exc:
+            logger.warning("下载 PDF 失败 %s: %s", pdf_url, exc)
+            return []
+
     try:
-        reader = PdfReader(io.BytesIO(resp.content))
-        text_parts = []
-        for page in reader.pages[:max_pages]:
-            try:
-                text_parts.append(page.extract_text() or "")
-            except Exception:
-                continue
-        text = "\n".join(text_parts)
-        return list({m.group(0) for m in GITHUB_PATTERN.finditer(text)})
+        return _parse(buf.getvalue(), False)
     except Exception as exc:
         logger.warning("解析 PDF 失败 %s: %s", pdf_url, exc)
         return []
+
+
+def extract_github_from_many(
+    pdf_urls: Sequence[Optional[str]], max_pages: int = 3, max_workers: int = MAX_CONCURRENT_DOWNLOADS
+) -> List[List[str]]:
+    """并发下载并解析多个 PDF，结果顺序与输入一致；空 URL 对应空列表。
+
+    下载在线程中进行，pypdf 解析是纯 Python 的 CPU 密集操作，交给多进程绕开 GIL。
+    """
+
+    if not pdf_urls:
+        return []
+    # 单核或只有一个 PDF 时直接在线程里解析，不必启动子进程
+    parse_pool = None
+    if (os.cpu_count() or 1) > 1 and sum(1 for url in pdf_urls if url) > 1:
+        parse_pool = _get_parse_pool()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pdf_urls))) as pool:
+        return list(pool.map(lambda url: extract_github_from_pdf(url, max_pages, parse_pool), pdf_urls))
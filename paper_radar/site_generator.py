@@ -1,82 +1,136 @@
+import hashlib
 import json
+import logging
+import os
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 
 from paper_radar import db
 
+logger = logging.getLogger(__name__)
 
+PAPER_COLUMNS = (
+    "id", "title", "authors", "affiliations", "abstract", "pdf_url",
+    "supplemental_url", "arxiv_id", "keywords", "created_at",
+)
+# 柱状图与词云只展示热度最高的主题；筛选下拉框由论文卡片生成，不受影响
+CHART_TOP_TOPICS = 20
+
+
+@lru_cache(maxsize=4)
 def build_env(template_dir: str):
+    # 同一模板目录复用 Environment，编译结果缓存到磁盘供后续运行直接加载；
+    # 不指定目录时 Jinja 使用按用户隔离、权限 0700 并校验属主的缓存目录
     return Environment(
         loader=FileSystemLoader(template_dir),
         autoescape=select_autoescape(['html']),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
     )
 
 
-def generate_site(db_path: str, site_dir: str, template_dir: str, site_meta: Dict):
+def _write_atomic(path: Path, chunks: Iterable[str]):
+    """逐块写入同目录临时文件再 os.replace，避免中断时留下半截页面。"""
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+        # mkstemp 默认 0600，静态页面需要对其他用户可读
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _template_stamp(template_dir: str) -> List:
+    # 按内容而非 mtime 计算：CI 每次全新 checkout 会刷新 mtime，但模板未变时哈希应保持一致
+    return [(p.name, hashlib.sha256(p.read_bytes()).hexdigest()) for p in sorted(Path(template_dir).glob("*.html"))]
+
+
+def _render_conf(
+    conf: Dict, conf_tmpl, db_path: str, site_dir: str, site_meta: Dict, stamp: List, force: bool = False
+) -> bool:
+    """渲染单个会议页；页面输入（数据库行、趋势、站点信息、模板）未变化且文件存在时跳过，返回是否重新生成。"""
+
+    rows = db.fetch_conference_rows(db_path, conf['name'], conf['year'])
+    trend = db.fetch_trend(db_path, conf['name'], conf['year'])
+    content_hash = hashlib.sha256(
+        json.dumps([conf, rows, trend, site_meta, stamp], ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+    path = Path(site_dir) / f"{conf['name']}_{conf['year']}.html"
+    if not force and path.exists() and db.fetch_site_hash(db_path, conf['name'], conf['year']) == content_hash:
+        return False
+
+    papers: List[Dict] = []
+    summaries: Dict[int, Optional[Dict]] = {}
+    clusters = defaultdict(list)
+    cluster_counts = defaultdict(int)
+    code_map = defaultdict(list)
+    # 单次 JOIN 查询，结果按 paper id 有序，同一论文的多行连续出现
+    for row in rows:
+        pid = row['id']
+        if not papers or papers[-1]['id'] != pid:
+            papers.append({col: row[col] for col in PAPER_COLUMNS})
+            summaries[pid] = (
+                {"tldr_en": row['tldr_en'], "tldr_zh": row['tldr_zh']} if row['summary_id'] is not None else None
+            )
+            if row['label'] is not None:
+                clusters[pid].append(row['label'])
+                cluster_counts[row['label']] += 1
+        if row['code_url'] is not None:
+            code_map[pid].append(
+                {
+                    "url": row['code_url'],
+                    "status": row['code_status'],
+                    "last_commit": row['last_commit'],
+                    "has_readme": bool(row['has_readme']),
+                    "has_code": bool(row['has_code']),
+                }
+            )
+    trend_summary = trend or "尚未生成趋势分析"
+    top_topics = dict(sorted(cluster_counts.items(), key=lambda item: -item[1])[:CHART_TOP_TOPICS])
+    # stream() 边渲染边写盘，大会议页面不必先在内存中拼出整页字符串
+    output = conf_tmpl.stream(
+        conf=conf,
+        papers=papers,
+        summaries=summaries,
+        clusters=clusters,
+        cluster_counts=json.dumps(top_topics, ensure_ascii=False),
+        trend_summary=trend_summary,
+        code_map=code_map,
+        site=site_meta,
+    )
+    _write_atomic(path, output)
+    db.save_site_hash(db_path, conf['name'], conf['year'], content_hash)
+    return True
+
+
+def generate_site(db_path: str, site_dir: str, template_dir: str, site_meta: Dict, force: bool = False):
     Path(site_dir).mkdir(parents=True, exist_ok=True)
     custom_domain = site_meta.get("custom_domain")
     if custom_domain:
-        (Path(site_dir) / "CNAME").write_text(custom_domain.strip() + "\n", encoding="utf-8")
+        _write_atomic(Path(site_dir) / "CNAME", [custom_domain.strip() + "\n"])
     env = build_env(template_dir)
     conferences = db.list_conferences(db_path)
     index_tmpl = env.get_template('index.html')
-    (Path(site_dir) / 'index.html').write_text(
-        index_tmpl.render(conferences=conferences, site=site_meta), encoding='utf-8'
-    )
+    _write_atomic(Path(site_dir) / 'index.html', index_tmpl.stream(conferences=conferences, site=site_meta))
     conf_tmpl = env.get_template('conference.html')
-    for conf in conferences:
-        papers = db.fetch_papers(db_path, conf['name'], conf['year'])
-        paper_map = {p['id']: p for p in papers}
-        summaries = {p['id']: None for p in papers}
-        with db.get_conn(db_path) as conn:
-            cur = conn.execute(
-                "SELECT paper_id, tldr_en, tldr_zh FROM summaries WHERE paper_id IN (%s)" %
-                ",".join(str(pid) for pid in paper_map.keys()) if paper_map else "SELECT paper_id, tldr_en, tldr_zh FROM summaries WHERE 1=0"
-            )
-            for row in cur.fetchall():
-                summaries[row[0]] = {"tldr_en": row[1], "tldr_zh": row[2]}
-            cluster_cur = conn.execute(
-                "SELECT paper_id, label FROM clusters WHERE conference=? AND year=?",
-                (conf['name'], conf['year']),
-            )
-            clusters = defaultdict(list)
-            cluster_counts = defaultdict(int)
-            for pid, label in cluster_cur.fetchall():
-                clusters[pid].append(label)
-                cluster_counts[label] += 1
-            trend_cur = conn.execute(
-                "SELECT summary FROM trends WHERE conference=? AND year=?",
-                (conf['name'], conf['year']),
-            )
-            trend_row = trend_cur.fetchone()
-            trend_summary = trend_row[0] if trend_row else "尚未生成趋势分析"
-            code_map = defaultdict(list)
-            code_cur = conn.execute(
-                "SELECT paper_id, url, status, last_commit, has_readme, has_code FROM code_links WHERE paper_id IN (%s)" %
-                ",".join(str(pid) for pid in paper_map.keys()) if paper_map else "SELECT paper_id, url, status, last_commit, has_readme, has_code FROM code_links WHERE 1=0"
-            )
-            for row in code_cur.fetchall():
-                code_map[row[0]].append(
-                    {
-                        "url": row[1],
-                        "status": row[2],
-                        "last_commit": row[3],
-                        "has_readme": bool(row[4]),
-                        "has_code": bool(row[5]),
-                    }
-                )
-        output = conf_tmpl.render(
-            conf=conf,
-            papers=papers,
-            summaries=summaries,
-            clusters=clusters,
-            cluster_counts=json.dumps(cluster_counts, ensure_ascii=False),
-            trend_summary=trend_summary,
-            code_map=code_map,
-            site=site_meta,
-        )
-        filename = f"{conf['name']}_{conf['year']}.html"
-        (Path(site_dir) / filename).write_text(output, encoding='utf-8')
+    if not conferences:
+        return
+    stamp = _template_stamp(template_dir)
+    # 各会议页面互不依赖，模板编译一次后并发渲染；内容未变的页面直接跳过
+    with ThreadPoolExecutor(max_workers=min(8, len(conferences))) as pool:
+        futures = [
+            pool.submit(_render_conf, conf, conf_tmpl, db_path, site_dir, site_meta, stamp, force)
+            for conf in conferences
+        ]
+        rendered = sum(future.result() for future in futures)
+    logger.info("会议页面重新生成 %d 个，跳过未变化的 %d 个", rendered, len(conferences) - rendered)
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -7,11 +8,11 @@ from dotenv import load_dotenv
 from paper_radar import db
 from paper_radar.arxiv_client import extract_github_links
 from paper_radar.ccf_monitor import load_deadlines, select_triggered_conferences, sync_ccf_repo
-from paper_radar.code_verifier import verify_repo
+from paper_radar.code_verifier import verify_many
 from paper_radar.config import AppConfig, get_env_or_raise
 from paper_radar.collector import collect_papers
 from paper_radar.llm_mcp import LLMClient
-from paper_radar.pdf_utils import extract_github_from_pdf
+from paper_radar.pdf_utils import extract_github_from_many
 from paper_radar.site_generator import generate_site
 
 logger = logging.getLogger(__name__)
@@ -26,7 +27,9 @@ class Pipeline:
         self._llm_client: Optional[LLMClient] = None
         try:
             api_key = get_env_or_raise(config.secrets.llm_api_key_env)
-            self._llm_client = LLMClient(config.llm.provider, config.llm.model, api_key)
+            self._llm_client = LLMClient(
+                config.llm.provider, config.llm.model, api_key, max_concurrency=config.llm.max_concurrency
+            )
         except Exception:
             logger.warning("未找到 LLM API Key，跳过摘要/聚类/趋势生成")
             self._llm_client = None
@@ -47,8 +50,16 @@ class Pipeline:
             deadlines,
             self.config.monitoring.deadline_lag_days,
         )
-        for conf in triggered:
-            self.process_conference(conf.name, conf.year, conf.arxiv_categories, conf.keywords)
+        # 各会议以网络 I/O 为主，并发处理；各外部服务的并发上限由对应模块的信号量统一控制
+        if triggered:
+            workers = max(1, min(self.config.monitoring.max_parallel_conferences, len(triggered)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(self.process_conference, conf.name, conf.year, conf.arxiv_categories, conf.keywords)
+                    for conf in triggered
+                ]
+            for future in futures:
+                future.result()
         self.render_site()
 
     def process_conference(self, name: str, year: int, categories, keywords):
@@ -57,36 +68,57 @@ class Pipeline:
         conf_cfg = next(c for c in self.config.conferences if c.name == name and c.year == year)
         papers = collect_papers(conf_cfg, self.config.monitoring, categories, keywords)
         db.insert_papers(self.db_path, papers)
-        # 2. 摘要批处理
-        if self._llm_client:
-            batch = db.fetch_papers_without_summary(
-                self.db_path, name, year, self.config.llm.max_batch_size
+        all_papers = db.fetch_papers(self.db_path, name, year)
+        # PDF 下载解析与 GitHub 核验不依赖摘要/聚类结果，放到后台线程与 LLM 阶段重叠执行
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            code_future = pool.submit(self._verify_code, all_papers)
+            if self._llm_client:
+                self._summarize(name, year)
+                self._cluster(name, year, all_papers)
+            code_future.result()
+
+    def _summarize(self, name: str, year: int):
+        # 2. 摘要批处理：一次取出全部待摘要论文，按 token 预算切批后并发请求，失败的批次留待下次运行
+        pending = db.fetch_papers_without_summary(self.db_path, name, year)
+        max_items = self.config.llm.max_batch_size
+        threshold = self.config.llm.batch_api_threshold
+        if threshold and len(pending) > threshold and self._llm_client.supports_batch_api:
+            summaries = self._llm_client.batch_summarize_via_batch_api(
+                [pending], max_wait=self.config.llm.batch_api_max_wait_hours * 3600, max_items=max_items
             )
-            while batch:
-                summaries = self._llm_client.batch_summarize(batch)
-                db.save_summaries(self.db_path, summaries)
-                batch = db.fetch_papers_without_summary(
-                    self.db_path, name, year, self.config.llm.max_batch_size
-                )
+        else:
+            summaries = self._llm_client.batch_summarize_many([pending], max_items=max_items)
+        db.save_summaries(self.db_path, summaries)
+
+    def _cluster(self, name: str, year: int, all_papers):
         # 3. 聚类与趋势
-        if self._llm_client:
-            all_papers = db.fetch_papers(self.db_path, name, year)
-            clusters = self._llm_client.cluster_papers(all_papers)
-            db.save_clusters(self.db_path, name, year, clusters)
-            cluster_counts = db.fetch_cluster_counts(self.db_path, name, year)
-            trend = self._llm_client.summarize_trend(cluster_counts)
-            if trend:
-                db.save_trend(self.db_path, name, year, trend)
+        clusters = self._llm_client.cluster_papers(all_papers)
+        db.save_clusters(self.db_path, name, year, clusters)
+        cluster_counts = db.fetch_cluster_counts(self.db_path, name, year)
+        trend = self._llm_client.summarize_trend(cluster_counts)
+        if trend:
+            db.save_trend(self.db_path, name, year, trend)
+
+    def _verify_code(self, all_papers):
         # 4. 代码验证
-        all_papers = db.fetch_papers(self.db_path, name, year)
-        for paper in all_papers:
+        pdf_links_per_paper = extract_github_from_many([paper.get("pdf_url") for paper in all_papers])
+        jobs = []
+        for paper, pdf_links in zip(all_papers, pdf_links_per_paper):
             links = set(extract_github_links(paper.get("abstract", "")))
-            pdf_links = extract_github_from_pdf(paper.get("pdf_url"))
             links.update(pdf_links)
             for link in links:
-                result = verify_repo(link, self.github_token, self._llm_client, paper.get("created_at"))
-                db.save_code_link(
-                    self.db_path,
+                jobs.append((paper, link))
+        results = verify_many(
+            [(link, paper.get("created_at")) for paper, link in jobs],
+            self.github_token,
+            self._llm_client,
+            db_path=self.db_path,
+            cache_days=self.config.monitoring.repo_cache_days,
+        )
+        db.save_code_links_bulk(
+            self.db_path,
+            [
+                (
                     paper["id"],
                     link,
                     result["status"],
@@ -94,6 +126,9 @@ class Pipeline:
                     result["has_readme"],
                     result["has_code"],
                 )
+                for (paper, link), result in zip(jobs, results)
+            ],
+        )
 
     def render_site(self):
         generate_site(
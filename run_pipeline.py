@@ -1,7 +1,7 @@
 import logging
 
 from paper_radar.config import load_config
-from paper_radar.db import init_db
+from paper_radar.db import close_db, init_db
 from paper_radar.workflow import Pipeline
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
@@ -11,7 +11,10 @@ def main():
     config = load_config()
     init_db(config.storage.db_path)
     pipeline = Pipeline(config)
-    pipeline.run()
+    try:
+        pipeline.run()
+    finally:
+        close_db()
 
 
 if __name__ == "__main__":
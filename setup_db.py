@@ -1,7 +1,7 @@
 """初始化 SQLite 数据库表结构"""
 
 from paper_radar.config import load_config
-from paper_radar.db import init_db, upsert_conference
+from paper_radar.db import close_db, init_db, upsert_conference
 
 
 def main():
@@ -9,6 +9,7 @@ def main():
     init_db(config.storage.db_path)
     for conf in config.conferences:
         upsert_conference(config.storage.db_path, conf.name, conf.year)
+    close_db()
     print(f"数据库已初始化并写入会议列表 -> {config.storage.db_path}")
 
 